@@ -3,16 +3,20 @@ PDF Invoice Extractor & Organizer
 Main Application Entry Point
 """
 import subprocess
+import errno
 import platform
 import os
 import sys
 import threading
+import time
 import queue
+import collections
 import shutil
-import csv
-import traceback
+import multiprocessing
+from concurrent.futures.process import BrokenProcessPool
+import logging
 import tkinter as tk
-from tkinter import ttk, filedialog, messagebox
+from tkinter import ttk
 from datetime import datetime
 from typing import List
 
@@ -20,6 +24,16 @@ from typing import List
 import parser
 from parser import ParseResult, Status, NamingScheme
 
+logger = logging.getLogger(__name__)
+
+# Max results sent to the GUI per "rows" message
+ROW_BATCH_SIZE = 16
+# Results CSV is flushed to disk every this many rows
+REPORT_FLUSH_EVERY = 50
+# Minimum seconds between progress messages from the worker
+PROGRESS_INTERVAL = 0.05
+# Fallback queue poll interval; normally <<WorkerMsg>> events drive the GUI
+QUEUE_POLL_MS = 500
 
 
 def open_file_or_folder(path):
@@ -33,6 +47,32 @@ def open_file_or_folder(path):
         
         
 # --- Helpers ---
+# os.link failures that mean "can't hardlink here", so a real copy is made instead.
+# Anything else (FileExistsError above all) is a genuine error.
+_LINK_FALLBACK_ERRNOS = {errno.EXDEV, errno.EPERM, errno.EACCES, errno.EMLINK,
+                         errno.ENOTSUP, errno.EOPNOTSUPP, errno.ENOSYS, errno.EINVAL}
+
+def copy_pdf(src, dst, preserve_metadata, link=False):
+    """
+    Copies src to dst as cheaply as possible. The destination folder must exist.
+    With link (src and dst on the same filesystem), dst becomes a hardlink of src.
+    """
+    # A hardlink copies no data at all
+    if link:
+        try:
+            os.link(src, dst)
+            return
+        except OSError as e:
+            if e.errno not in _LINK_FALLBACK_ERRNOS:
+                raise
+            # e.g. FAT/exFAT or no permission to link; fall back to a real copy
+
+    if preserve_metadata:
+        shutil.copy2(src, dst)
+    else:
+        # copyfile uses sendfile/copy_file_range where available and skips chmod/utime
+        shutil.copyfile(src, dst)
+
 def resource_path(relative_path):
     """ Get absolute path to resource, works for dev and for PyInstaller """
     try:
@@ -59,18 +99,15 @@ class SplashScreen:
         bg_color = "#2c3e50"
         self.window.configure(bg=bg_color)
         
-        # Try loading logo
+        # Try loading logo (pre-rendered to 100x100 by build_assets.py, so no PIL needed)
         try:
-            from PIL import Image, ImageTk
-            img_path = resource_path(os.path.join('assets', 'logo.png'))
+            img_path = resource_path(os.path.join('assets', 'logo_100.png'))
             if os.path.exists(img_path):
-                load = Image.open(img_path)
-                load = load.resize((100, 100))
-                self.render = ImageTk.PhotoImage(load)
+                self.render = tk.PhotoImage(file=img_path)
                 img = tk.Label(self.window, image=self.render, bg=bg_color, bd=0)
                 img.pack(pady=(40, 10))
         except Exception:
-            # Fallback if PIL not installed or image missing
+            # Fallback if image missing or unreadable
             tk.Label(self.window, text="[LOGO]", bg=bg_color, fg="white").pack(pady=50)
 
         tk.Label(self.window, text="PDF Invoice Extractor", 
@@ -78,11 +115,118 @@ class SplashScreen:
         tk.Label(self.window, text="Loading...", 
                  font=("Segoe UI", 10), bg=bg_color, fg="#bdc3c7").pack(pady=10)
         
-        self.window.update()
+        self.window.update_idletasks()
 
     def close(self):
         self.window.destroy()
 
+class ResultsTable(ttk.Frame):
+    """
+    Append-only results table that only draws the rows in view.
+    Rows live in a plain list; the canvas holds items for one screenful,
+    so inserts and memory stay cheap however many files are processed.
+    """
+    ROW_HEIGHT = 22
+    HEADER_BG = "#dcdad5"
+
+    def __init__(self, parent, columns, tag_colors):
+        super().__init__(parent)
+        self.columns = columns        # [(heading, width_px), ...]
+        self.tag_colors = tag_colors  # tag -> row background
+        self.rows = []                # [(values, tag), ...]
+        self.first = 0                # Index of the top visible row
+        self._frozen = False          # True while a bulk update is in progress
+
+        self.header = tk.Canvas(self, height=self.ROW_HEIGHT, bg=self.HEADER_BG, highlightthickness=0)
+        self.canvas = tk.Canvas(self, bg="white", highlightthickness=0)
+        self.sb = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.yview)
+
+        self.header.grid(row=0, column=0, sticky="ew")
+        self.canvas.grid(row=1, column=0, sticky="nsew")
+        self.sb.grid(row=0, column=1, rowspan=2, sticky="ns")
+        self.grid_rowconfigure(1, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        x = 0
+        for heading, width in self.columns:
+            self.header.create_text(x + 4, self.ROW_HEIGHT // 2, text=heading, anchor="w",
+                                    font=('Segoe UI', 9, 'bold'))
+            x += width
+            self.header.create_line(x - 1, 0, x - 1, self.ROW_HEIGHT, fill="#b0aea8")
+
+        self.canvas.bind("<Configure>", lambda e: self.redraw())
+        self.canvas.bind("<MouseWheel>", self._on_wheel)                      # Windows / macOS
+        self.canvas.bind("<Button-4>", lambda e: self.yview("scroll", -3, "units")) # Linux
+        self.canvas.bind("<Button-5>", lambda e: self.yview("scroll", 3, "units"))
+
+    def visible_count(self):
+        return max(1, self.canvas.winfo_height() // self.ROW_HEIGHT)
+
+    def append(self, rows):
+        self.rows.extend(rows)
+        self.redraw()
+
+    def clear(self):
+        self.rows = []
+        self.first = 0
+        self.redraw()
+
+    def freeze(self):
+        """Suspends redraws and scrollbar updates until thaw()."""
+        self._frozen = True
+
+    def thaw(self):
+        self._frozen = False
+        self.redraw()
+
+    def yview(self, *args):
+        """Scrollbar protocol: ('moveto', fraction) or ('scroll', n, 'units'|'pages')."""
+        if args[0] == "moveto":
+            self.first = int(float(args[1]) * len(self.rows))
+        elif args[0] == "scroll":
+            n = int(args[1])
+            if args[2] == "pages":
+                n *= self.visible_count()
+            self.first += n
+        self.redraw()
+
+    def yview_moveto(self, fraction):
+        self.yview("moveto", fraction)
+
+    def _on_wheel(self, event):
+        self.yview("scroll", -3 if event.delta > 0 else 3, "units")
+
+    def redraw(self):
+        if self._frozen:
+            return
+        visible = self.visible_count()
+        total = len(self.rows)
+        self.first = max(0, min(self.first, total - visible))
+
+        c = self.canvas
+        c.delete("all")
+        canvas_width = c.winfo_width()
+        h = self.ROW_HEIGHT
+
+        for i, (values, tag) in enumerate(self.rows[self.first:self.first + visible]):
+            y = i * h
+            bg = self.tag_colors.get(tag, "white")
+            x = 0
+            for col, ((_, width), val) in enumerate(zip(self.columns, values)):
+                if col == len(self.columns) - 1:
+                    width = max(width, canvas_width - x)
+                # Each cell's background is drawn after the previous cell's text,
+                # so it also clips any overflow from the column to its left
+                c.create_rectangle(x, y, x + width, y + h, fill=bg, outline="")
+                c.create_text(x + 4, y + h // 2, text="" if val is None else val, anchor="w")
+                x += width
+
+        if total:
+            self.sb.set(self.first / total, min(1.0, (self.first + visible) / total))
+        else:
+            self.sb.set(0, 1)
+
+
 class InvoiceApp:
     def __init__(self, root):
         self.root = root
@@ -95,9 +239,15 @@ class InvoiceApp:
         self.naming_var = tk.StringVar(value=NamingScheme.INVOICE_NUMBER.value)
         self.organize_by_month = tk.BooleanVar(value=False)
         self.dry_run = tk.BooleanVar(value=True)
+        self.preserve_metadata = tk.BooleanVar(value=False)
+        self.hardlink_outputs = tk.BooleanVar(value=False)
         
-        self.queue = queue.Queue()
+        # Worker -> GUI messages. deque append/popleft are atomic in CPython,
+        # so no lock is needed; _wake tells process_queue there is work.
+        self.queue = collections.deque()
+        self._wake = threading.Event()
         self.results: List[ParseResult] = []
+        self.skipped_results: List[ParseResult] = []
         self.processing = False
         
         self.setup_ui()
@@ -159,6 +309,13 @@ class InvoiceApp:
         self.chk_dry = ttk.Checkbutton(frm_opts, text="DRY RUN (Preview only - No files copied)", variable=self.dry_run)
         self.chk_dry.pack(side=tk.LEFT, padx=20)
         
+        # Off by default: skipping the chmod/utime of copy2 makes copies cheaper
+        ttk.Checkbutton(frm_opts, text="Preserve metadata", variable=self.preserve_metadata).pack(side=tk.LEFT, padx=10)
+        
+        # Opt-in: a hardlink is the original file, so editing an output edits the original too
+        ttk.Checkbutton(frm_opts, text="Hardlink instead of copy (same drive; edits change originals)",
+                        variable=self.hardlink_outputs).pack(side=tk.LEFT, padx=10)
+        
         # --- Action Bar ---
         btn_frame = ttk.Frame(main_frame, padding=10)
         btn_frame.pack(fill=tk.X)
@@ -177,41 +334,44 @@ class InvoiceApp:
         self.progress.pack(fill=tk.X, pady=5)
         
         # --- Results Table ---
-        cols = ("orig", "new", "inv", "date", "amt", "status", "reason")
-        self.tree = ttk.Treeview(main_frame, columns=cols, show='headings', selectmode='browse')
-        
-        self.tree.heading("orig", text="Original File")
-        self.tree.heading("new", text="Proposed Filename")
-        self.tree.heading("inv", text="Invoice #")
-        self.tree.heading("date", text="Date")
-        self.tree.heading("amt", text="Total")
-        self.tree.heading("status", text="Status")
-        self.tree.heading("reason", text="Details")
-        
-        self.tree.column("orig", width=150)
-        self.tree.column("new", width=200)
-        self.tree.column("inv", width=80)
-        self.tree.column("date", width=80)
-        self.tree.column("amt", width=70)
-        self.tree.column("status", width=70)
-        self.tree.column("reason", width=200)
-        
-        # Scrollbar
-        sb = ttk.Scrollbar(main_frame, orient=tk.VERTICAL, command=self.tree.yview)
-        self.tree.configure(yscrollcommand=sb.set)
-        
-        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        sb.pack(side=tk.RIGHT, fill=tk.Y)
-
-        # Tags for colors
-        self.tree.tag_configure('OK', background='#d4edda') # Light Green
-        self.tree.tag_configure('PARTIAL', background='#fff3cd') # Light Yellow
-        self.tree.tag_configure('SKIPPED', background='#f8d7da') # Light Red
-
-        # Start Queue Checker
-        self.root.after(100, self.process_queue)
+        # Built once the event loop is idle so the window paints first
+        self.root.after_idle(self._build_results_table, main_frame)
+
+        # Start Queue Checker: workers wake us with <<WorkerMsg>>, the timer is a safety net
+        self.root.bind("<<WorkerMsg>>", lambda e: self.process_queue())
+        self.root.after(QUEUE_POLL_MS, self.poll_queue)
+
+    def _build_results_table(self, main_frame):
+        self.table = ResultsTable(
+            main_frame,
+            columns=[
+                ("Original File", 150),
+                ("Proposed Filename", 200),
+                ("Invoice #", 80),
+                ("Date", 80),
+                ("Total", 70),
+                ("Status", 110),
+                ("Details", 200),
+            ],
+            tag_colors={
+                'OK': '#d4edda',      # Light Green
+                'PARTIAL': '#fff3cd', # Light Yellow
+                'SKIPPED': '#f8d7da', # Light Red
+            }
+        )
+        self.table.pack(fill=tk.BOTH, expand=True)
+
+    def post(self, msg):
+        """Hands a message to the GUI thread. Safe to call from any thread."""
+        self.queue.append(msg)
+        self._wake.set()
+        try:
+            self.root.event_generate("<<WorkerMsg>>", when="tail")
+        except (tk.TclError, RuntimeError):
+            pass # Window gone or loop not running; poll_queue will pick it up
 
     def browse_input(self):
+        from tkinter import filedialog # Deferred: not needed to paint the splash
         d = filedialog.askdirectory()
         if d: 
             self.input_folder.set(d)
@@ -219,6 +379,7 @@ class InvoiceApp:
                 self.output_folder.set(d) # Default output to input
 
     def browse_output(self):
+        from tkinter import filedialog # Deferred: not needed to paint the splash
         d = filedialog.askdirectory()
         if d: self.output_folder.set(d)
         
@@ -232,6 +393,7 @@ class InvoiceApp:
         out = self.output_folder.get()
         
         if not inp or not os.path.isdir(inp):
+            from tkinter import messagebox
             messagebox.showerror("Error", "Select a valid input folder.")
             return
             
@@ -240,21 +402,28 @@ class InvoiceApp:
             
         self.processing = True
         self.btn_start.config(state=tk.DISABLED)
-        self.tree.delete(*self.tree.get_children())
+        self.table.clear()
         self.results = []
+        self.skipped_results = []
         self.btn_open.config(state=tk.DISABLED)
         
         # Config options
-        scheme = NamingScheme(self.naming_var.get())
+        name_fn = parser.make_namer(NamingScheme(self.naming_var.get()))
         by_month = self.organize_by_month.get()
         is_dry = self.dry_run.get()
+        preserve = self.preserve_metadata.get()
+        hardlink = self.hardlink_outputs.get()
         
         # Start Thread
-        t = threading.Thread(target=self.worker, args=(inp, out, scheme, by_month, is_dry))
+        t = threading.Thread(target=self.worker, args=(inp, out, name_fn, by_month, is_dry, preserve, hardlink))
         t.start()
         
-    def worker(self, input_dir, output_dir, scheme, by_month, is_dry):
-        files = [f for f in os.listdir(input_dir) if f.lower().endswith('.pdf')]
+    def worker(self, input_dir, output_dir, name_fn, by_month, is_dry, preserve, hardlink):
+        # scandir's DirEntry carries the file type from the directory read,
+        # so filtering out folders costs no extra stat per entry
+        with os.scandir(input_dir) as it:
+            files = [(e.name, e.path) for e in it
+                     if e.is_file() and e.name.lower().endswith('.pdf')]
         total = len(files)
         
         # Ensure output dir exists if not dry run
@@ -262,118 +431,244 @@ class InvoiceApp:
             try:
                 os.makedirs(output_dir)
             except Exception as e:
-                self.queue.put(("error", f"Cannot create output folder: {e}"))
+                self.post(("error", f"Cannot create output folder: {e}"))
                 return
 
-        for idx, filename in enumerate(files):
-            self.queue.put(("progress", (idx / total) * 100, f"Processing {idx+1}/{total}: {filename}"))
-            
-            fpath = os.path.join(input_dir, filename)
-            
-            try:
-                # 1. Parse
-                res = parser.process_single_pdf(fpath, filename)
-                
-                # 2. Determine Paths
-                res.proposed_filename = parser.generate_proposed_filename(filename, res.data, scheme)
-                
-                # If skipped, target path is N/A
-                if res.status == parser.Status.SKIPPED:
-                    res.target_path = "N/A"
-                else:
-                    target_full = parser.calculate_target_path(output_dir, res.proposed_filename, res.data, by_month)
-                    
-                    # 3. Handle File Operations (Rename/Copy)
-                    if not is_dry:
-                        try:
-                            # Calculate safe unique path
-                            safe_path = parser.get_safe_unique_path(target_full)
-                            res.target_path = safe_path
-                            
-                            # Create subfolders
-                            os.makedirs(os.path.dirname(safe_path), exist_ok=True)
-                            
-                            # COPY (Safer than move)
-                            shutil.copy2(fpath, safe_path)
-                            
-                        except OSError as e:
-                            res.status = parser.Status.SKIPPED
-                            res.reason = f"Permission/Write Error: {e}"
-                        except Exception as e:
-                            res.status = parser.Status.SKIPPED
-                            res.reason = f"System Error: {str(e)[:50]}"
-                    else:
-                        # Dry Run: Just show where it WOULD go
-                        res.target_path = target_full + " (preview)"
+        # Results CSV is written row by row as files complete
+        ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+        report = self.open_report(output_dir, is_dry, ts)
 
-                self.results.append(res)
-                self.queue.put(("row", res))
-                
-            except Exception as e:
-                # Catch-all
-                tb = traceback.format_exc()
-                print(tb) # To console for debug
-                # Log to queue?
-                
-        # Generate Reports
-        self.save_reports(output_dir, is_dry)
-        
-        self.queue.put(("done", is_dry))
+        # Unexpected failures this run go to the output folder's errors.log, where
+        # save_reports also lists the skipped files. delay=True: the file is only
+        # created once something is logged.
+        log_handler = logging.FileHandler(os.path.join(output_dir, "errors.log"),
+                                          encoding='utf-8', delay=True)
+        log_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+        logger.addHandler(log_handler)
 
-    def save_reports(self, folder, is_dry):
-        ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-        name = "preview_run.csv" if is_dry else f"extraction_results_{ts}.csv"
-        
+        # Each target folder gets listed once per run for name collisions
+        parser.reset_dir_cache()
+
+        # Copies run on their own thread so disk writes overlap with parsing
+        copy_q = queue.Queue(maxsize=32)
+        copier_thread = threading.Thread(target=self.copier, args=(copy_q, report, preserve, hardlink), daemon=True)
+        copier_thread.start()
+
+        # Parsed in worker processes, in input order; naming and copying stay here
+        paths = [fpath for _, fpath in files]
+        parsed = parser.parse_in_pool(paths, [name for name, _ in files])
+        done = 0
+        last_prog = 0.0
         try:
-            with open(os.path.join(folder, name), 'w', newline='', encoding='utf-8-sig') as f:
-                writer = csv.writer(f)
-                
-                # 1. REMOVED "Proposed Filename" and "Target Path" from this list:
-                writer.writerow(["Original Filename", "Invoice Number", "Date", "Total Amount", "Status", "Reason"])
-                
-                for r in self.results:
-                    # 2. REMOVED r.proposed_filename and r.target_path from this list:
+            for idx, ((filename, fpath), res) in enumerate(zip(files, parsed)):
+                done = idx + 1
+
+                # Cap progress updates at ~20 Hz, but always report the last file
+                now = time.monotonic()
+                if now - last_prog > PROGRESS_INTERVAL or idx == total - 1:
+                    self.post(("progress", (idx / total) * 100, f"Processing {idx+1}/{total}: {filename}"))
+                    last_prog = now
+
+                try:
+                    # 1. Parse (already done in the pool)
+                    # 2. Determine Paths
+                    res.proposed_filename = name_fn(filename, res.data)
+
+                    # If skipped, target path is N/A
+                    target_full = None
+                    if res.status == parser.Status.SKIPPED:
+                        res.target_path = "N/A"
+                    else:
+                        target_full = parser.calculate_target_path(output_dir, res.proposed_filename, res.data, by_month)
+                        if is_dry:
+                            # Dry Run: Just record where it WOULD go
+                            res.target_path = target_full
+                            res.is_preview = True
+                            target_full = None
+
+                    # 3. Hand off to the copier, which also publishes the row
+                    copy_q.put((fpath, target_full, res))
+
+                except Exception as e:
+                    # Catch-all: log it and still give the file a row
+                    logger.exception("PDF failed: %s", filename)
+                    res = ParseResult(filename, Status.SKIPPED, f"System Error: {str(e)[:50]}", {})
+                    res.target_path = "N/A"
+                    copy_q.put((fpath, None, res))
+
+        except BrokenProcessPool:
+            # A parse process died (crash, OOM kill). Its chunk and everything
+            # after it is lost, so those files still get a row, as skipped.
+            logger.exception("Parse pool died after %d of %d files", done, total)
+            for filename, fpath in files[done:]:
+                res = ParseResult(filename, Status.SKIPPED, "Read Error: parse pool died before this file finished", {})
+                res.target_path = "N/A"
+                copy_q.put((fpath, None, res))
+        finally:
+            parsed.close() # Stops the pool and read-ahead if the loop ended early
+            copy_q.put(None)
+            copier_thread.join()
+
+            logger.removeHandler(log_handler)
+            log_handler.close()
+
+            # Generate Reports
+            if report:
+                report[0].close()
+            self.save_reports(output_dir, ts)
+
+            self.post(("done", is_dry))
+
+    def copier(self, copy_q, report, preserve, hardlink):
+        """Drains (source, target, result) jobs; a target of None means nothing to copy."""
+        batch = []
+        written = 0
+        # Folder -> st_dev (None unless hardlinking), for target folders made this
+        # run and source folders; skips a mkdir and the hardlink check's stats per file
+        created_dirs = {}
+        src_devs = {}
+        while True:
+            item = copy_q.get()
+            if item is None:
+                break
+            fpath, target_full, res = item
+
+            if target_full is not None:
+                try:
+                    # Calculate safe unique path. Done here rather than in the
+                    # worker so pending copies can't be handed the same name.
+                    safe_path = parser.get_safe_unique_path(target_full)
+                    res.target_path = safe_path
+
+                    # Create subfolders
+                    target_dir = os.path.dirname(safe_path)
+                    if target_dir not in created_dirs:
+                        os.makedirs(target_dir, exist_ok=True)
+                        created_dirs[target_dir] = os.stat(target_dir).st_dev if hardlink else None
+
+                    # Hardlinks only when asked for, and only within one filesystem
+                    link = False
+                    if hardlink:
+                        src_dir = os.path.dirname(fpath)
+                        if src_dir not in src_devs:
+                            src_devs[src_dir] = os.stat(src_dir).st_dev
+                        link = src_devs[src_dir] == created_dirs[target_dir]
+
+                    # COPY (Safer than move)
+                    copy_pdf(fpath, safe_path, preserve, link=link)
+
+                except OSError as e:
+                    res.status = parser.Status.SKIPPED
+                    res.reason = f"Permission/Write Error: {e}"
+                except Exception as e:
+                    res.status = parser.Status.SKIPPED
+                    res.reason = f"System Error: {str(e)[:50]}"
+
+            self.results.append(res)
+            if res.status == parser.Status.SKIPPED:
+                self.skipped_results.append(res)
+
+            if report:
+                f, writer = report
+                try:
                     writer.writerow([
-                        r.filename, 
-                        r.data.get('invoice_number'), 
-                        r.data.get('date'), 
-                        r.data.get('total_amount'), 
-                        r.status.value, 
-                        r.reason
+                        res.filename,
+                        res.invoice_number,
+                        res.date,
+                        res.total_amount,
+                        res.status.value,
+                        res.reason
                     ])
-        except: pass
+                    written += 1
+                    if written % REPORT_FLUSH_EVERY == 0:
+                        f.flush()
+                except OSError as e:
+                    # Stop reporting rather than take the copier down with it
+                    self.post(("warning", f"CSV write failed: {e}"))
+                    f.close()
+                    report = None
+
+            # Precompute the table row here so the GUI thread only inserts it.
+            # Dry-run rows are marked, since nothing was copied for them.
+            status_cell = f"{res.status.value} (preview)" if res.is_preview else res.status.value
+            res._row_tuple = (
+                res.filename, res.proposed_filename,
+                res.invoice_number, res.date, res.total_amount,
+                status_cell, res.reason
+            )
+            res._tag = res.status.value
+
+            # Rows go to the GUI in batches while we're behind, immediately when idle
+            batch.append(res)
+            if len(batch) >= ROW_BATCH_SIZE or copy_q.empty():
+                self.post(("rows", batch))
+                batch = []
+
+        if batch:
+            self.post(("rows", batch))
+
+    def open_report(self, folder, is_dry, ts):
+        """Creates the results CSV with its header. Returns (file, writer) or None."""
+        import csv
+        name = "preview_run.csv" if is_dry else f"extraction_results_{ts}.csv"
         
-        # ... (Keep the rest of the error logging code exactly as it was) ...
-        if any(r.status == parser.Status.SKIPPED for r in self.results):
+        try:
+            f = open(os.path.join(folder, name), 'w', newline='', encoding='utf-8-sig')
+            writer = csv.writer(f)
+            # Proposed Filename and Target Path are intentionally not reported
+            writer.writerow(["Original Filename", "Invoice Number", "Date", "Total Amount", "Status", "Reason"])
+            return f, writer
+        except OSError as e:
+            self.post(("warning", f"CSV write failed: {e}"))
+            return None
+
+    def save_reports(self, folder, ts):
+        # Append skipped files to errors.log in the output folder
+        if self.skipped_results:
             try:
                 with open(os.path.join(folder, "errors.log"), "a", encoding='utf-8') as f:
                     f.write(f"\n--- Run {ts} ---\n")
-                    for r in [x for x in self.results if x.status == parser.Status.SKIPPED]:
+                    for r in self.skipped_results:
                         f.write(f"{r.filename}: {r.reason}\n")
-            except: pass
+            except OSError as e:
+                self.post(("warning", f"errors.log write failed: {e}"))
     
     
+    def insert_rows(self, rows):
+        """Inserts a burst of results, scrolling to the end only once."""
+        # Freeze so the append and the scroll cost one redraw between them
+        self.table.freeze()
+        self.table.append([(r._row_tuple, r._tag) for r in rows])
+        self.table.yview_moveto(1)
+        self.table.thaw()
+
     def process_queue(self):
+        from tkinter import messagebox
+        rows = []
         try:
-            while True:
-                msg = self.queue.get_nowait()
+            # Nothing posted since the last drain
+            if not self._wake.is_set():
+                return
+            self._wake.clear()
+
+            while self.queue:
+                msg = self.queue.popleft()
                 mtype = msg[0]
                 
+                if mtype == "rows":
+                    rows.extend(msg[1])
+                    continue
+
+                # Keep the table ahead of the completion/error dialogs
+                if rows and mtype != "progress":
+                    self.insert_rows(rows)
+                    rows = []
+
                 if mtype == "progress":
                     val, txt = msg[1], msg[2]
                     self.progress['value'] = val
                     self.lbl_status.config(text=txt)
                     
-                elif mtype == "row":
-                    r = msg[1]
-                    # Insert into tree
-                    self.tree.insert("", "end", values=(
-                        r.filename, r.proposed_filename, 
-                        r.data.get('invoice_number'), r.data.get('date'), r.data.get('total_amount'),
-                        r.status.value, r.reason
-                    ), tags=(r.status.value,))
-                    self.tree.yview_moveto(1)
-                    
                 elif mtype == "done":
                     is_dry = msg[1]
                     self.processing = False
@@ -390,17 +685,28 @@ class InvoiceApp:
                     
                     self.lbl_status.config(text="Done")
                     
+                elif mtype == "warning":
+                    # Reported mid-run; processing carries on
+                    messagebox.showwarning("Warning", msg[1])
+                    
                 elif mtype == "error":
                     messagebox.showerror("Error", msg[1])
                     self.processing = False
                     self.btn_start.config(state=tk.NORMAL)
                     
-        except queue.Empty:
+        except IndexError:
             pass
         finally:
-            self.root.after(100, self.process_queue)
+            if rows:
+                self.insert_rows(rows)
+
+    def poll_queue(self):
+        self.process_queue()
+        self.root.after(QUEUE_POLL_MS, self.poll_queue)
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support() # See parser.parse_in_pool
+
     # Ensure high DPI awareness
     try:
         from ctypes import windll
@@ -415,5 +721,8 @@ if __name__ == "__main__":
     root.after(2500, lambda: root.deiconify()) # Show main window
     
     root.withdraw() # Hide main window initially
+
+    # Flush the splash's geometry/drawing before building the main UI
+    root.update_idletasks()
     app = InvoiceApp(root)
     root.mainloop()
\ No newline at end of file
@@ -0,0 +1,30 @@
+"""
+Asset Pre-rendering Script
+Bakes the resized images shown at startup so the app can load them with
+tk.PhotoImage instead of decoding and resampling through PIL on every launch.
+Run again whenever the source artwork in assets/ changes:
+
+    python build_assets.py
+"""
+
+import os
+from PIL import Image
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'assets')
+
+# (source, output, size)
+RENDERS = [
+    ('logo.jpg', 'logo_100.png', (100, 100)),
+]
+
+
+def main():
+    for src, dst, size in RENDERS:
+        img = Image.open(os.path.join(ASSETS_DIR, src))
+        img = img.resize(size, Image.Resampling.LANCZOS)
+        img.save(os.path.join(ASSETS_DIR, dst), optimize=True)
+        print(f"{src} -> {dst} {size[0]}x{size[1]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,21 +9,99 @@ import sys
 import csv
 import shutil
 import threading
+import time
 import queue
 import traceback
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
+from operator import itemgetter
 from pathlib import Path
 from typing import List, Optional
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 
-import pandas as pd
 from parser import (
-    process_single_pdf, ParseResult, Status, NamingScheme,
-    generate_proposed_filename, generate_target_path, get_unique_filepath,
+    parse_in_pool, PARSE_CHUNKSIZE, ParseResult, BatchResults, Status, NamingScheme,
+    make_namer, calculate_target_path,
     sanitize_filename
 )
 
+# Startup no longer imports pandas, so the splash only needs a brief showing
+SPLASH_DURATION_MS = 500
+
+EXCEL_HEADERS = [
+    'Original_Filename', 'Proposed_Filename', 'Target_Path', 'Invoice_Number',
+    'Invoice_Date', 'Total_Amount', 'Vendor', 'Status', 'Details'
+]
+
+# Batches of more rows than this are inserted with the tree detached
+TREE_DETACH_THRESHOLD = 200
+
+# Extracted fields shown in the results table, fetched in one call per row
+_ROW_KEYS = itemgetter('invoice_number', 'date', 'total_amount')
+_EMPTY_ROW = ('', '', '')
+
+# Large write buffer for CSV outputs, so big reports go out in few syscalls
+CSV_BUFFER_SIZE = 1024 * 1024
+
+# Minimum seconds between progress label updates (the last file always reports)
+PROGRESS_INTERVAL = 0.05
+
+# Workers wake the GUI with <<QueueUpdate>>; this poll only catches anything missed
+QUEUE_SAFETY_POLL_MS = 200
+
+
+if sys.platform == 'win32':
+    import ctypes
+    from ctypes import wintypes
+    
+    _kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    _CopyFileExW = _kernel32.CopyFileExW
+    _CopyFileExW.argtypes = (wintypes.LPCWSTR, wintypes.LPCWSTR, ctypes.c_void_p,
+                             ctypes.c_void_p, ctypes.POINTER(wintypes.BOOL), wintypes.DWORD)
+    _CopyFileExW.restype = wintypes.BOOL
+    
+    def _copy_file(source: str, target: str):
+        # Let the kernel do the copy; CopyFileEx also carries timestamps and attributes
+        if not _CopyFileExW(source, target, None, None, None, 0):
+            raise ctypes.WinError(ctypes.get_last_error())
+else:
+    # copy2 already uses sendfile / fcopyfile on Linux and macOS
+    _copy_file = shutil.copy2
+
+
+def _file_size(entry: os.DirEntry) -> int:
+    try:
+        return entry.stat().st_size
+    except OSError:
+        return 0
+
+
+def _deal_chunks(items: list, chunksize: int) -> list:
+    """
+    Reorders items so map()'s consecutive chunks of chunksize are dealt out in
+    rotation: with items sorted largest first, each chunk starts with one of the
+    largest instead of the first chunk taking the top chunksize between them.
+    """
+    n = -(-len(items) // chunksize)
+    if n <= 1:
+        return list(items)
+    # Only the last chunk may be short, or map's chunk boundaries would shift
+    last = len(items) - (n - 1) * chunksize
+    chunks = [[] for _ in range(n)]
+    it = iter(items)
+    for rnd in range(chunksize):
+        for chunk in (chunks if rnd < last else chunks[:-1]):
+            chunk.append(next(it))
+    return [item for chunk in chunks for item in chunk]
+
+
+def _ellip(s: str, n: int) -> str:
+    """Truncates s to n characters, marking the cut with '...'."""
+    return s if len(s) <= n else f"{s[:n]}..."
+
 
 def resource_path(relative_path: str) -> str:
     """Get absolute path to resource, works for dev and PyInstaller."""
@@ -52,7 +130,7 @@ class SplashScreen:
         
         self.load_splash_image()
         
-        self.root.after(2500, self.close)
+        self.root.after(SPLASH_DURATION_MS, self.close)
     
     def load_splash_image(self):
         """Load and display splash image."""
@@ -111,14 +189,28 @@ class InvFrogApp:
         
         self.status_queue = queue.Queue()
         self.is_processing = False
-        self.results: List[ParseResult] = []
+        self.results = BatchResults()
+        self.skipped_rows: List[int] = []
         self.last_excel_path: str = ""
         self.copied_count = 0
         
+        # File copies are I/O-bound; run them on threads so they overlap with parsing
+        self.copy_pool = ThreadPoolExecutor(max_workers=4)
+        self.copy_lock = threading.Lock()
+        # Output dirs already made this run (guarded by copy_lock)
+        self._created_dirs: set = set()
+        # Target path -> last numeric suffix handed out (guarded by copy_lock)
+        self._unique_counters: dict = {}
+        
+        # errors.log stays open for the whole run; opened on the first error
+        self._error_log = None
+        self._error_log_lock = threading.Lock()
+        
         self.logo_img = None
         
         self.setup_styles()
         self.create_widgets()
+        self.root.bind("<<QueueUpdate>>", lambda e: self.drain_queue())
         self.check_queue()
     
     def setup_styles(self):
@@ -398,14 +490,19 @@ class InvFrogApp:
                 messagebox.showerror("Error", f"Cannot create output folder: {e}")
                 return
         
-        pdf_files = [f for f in os.listdir(input_folder) if f.lower().endswith('.pdf')]
+        # DirEntry caches the file type from the directory read and carries the full path
+        with os.scandir(input_folder) as it:
+            pdf_files = [e for e in it if e.is_file() and e.name.lower().endswith('.pdf')]
         if not pdf_files:
             messagebox.showwarning("No PDFs", "No PDF files found in the selected folder.")
             return
         
         self.is_processing = True
-        self.results = []
+        self.results = BatchResults()
+        self.skipped_rows = []
         self.copied_count = 0
+        self._created_dirs = set()
+        self._unique_counters = {}
         self.tree.delete(*self.tree.get_children())
         
         self.extract_btn.configure(state='disabled')
@@ -418,58 +515,132 @@ class InvFrogApp:
         self.progress_bar['maximum'] = len(pdf_files)
         self.progress_bar['value'] = 0
         
-        naming = NamingScheme(self.naming_scheme.get())
-        organize = self.organize_by_month.get()
-        dry_run = self.dry_run_mode.get()
+        # Snapshot the Tk variables once; worker threads only ever see these plain values
+        self._cfg_naming = NamingScheme(self.naming_scheme.get())
+        self._cfg_organize = self.organize_by_month.get()
+        self._cfg_dry = self.dry_run_mode.get()
         
         thread = threading.Thread(
             target=self.process_files,
-            args=(input_folder, output_folder, pdf_files, naming, organize, dry_run),
+            args=(input_folder, output_folder, pdf_files,
+                  self._cfg_naming, self._cfg_organize, self._cfg_dry),
             daemon=True
         )
         thread.start()
     
-    def process_files(self, input_folder: str, output_folder: str, pdf_files: List[str],
+    def process_files(self, input_folder: str, output_folder: str, pdf_files: List[os.DirEntry],
                       naming_scheme: NamingScheme, organize_by_month: bool, dry_run: bool):
+        # Largest first, so a big PDF doesn't end up as the last straggler in the
+        # pool. Sorted here rather than on the Tk thread: stat() can be slow on big
+        # folders, and a file that vanished since the listing just sorts last.
+        pdf_files = sorted(pdf_files, key=_file_size, reverse=True)
+        # ...and the biggest files spread over different chunks, not one worker
+        pdf_files = _deal_chunks(pdf_files, PARSE_CHUNKSIZE)
         total = len(pdf_files)
-        
-        for idx, filename in enumerate(pdf_files, 1):
-            filepath = os.path.join(input_folder, filename)
-            
-            self.status_queue.put(('progress', idx, total, filename))
-            
-            try:
-                result = process_single_pdf(filepath, filename)
-                
-                proposed_name = generate_proposed_filename(filename, result.data, naming_scheme)
-                target_path = generate_target_path(output_folder, proposed_name, result.data, organize_by_month)
+        copy_futures = []
+        last_progress = 0.0
+        # The scheme is fixed for the run, so resolve its builder once
+        namer = make_namer(naming_scheme)
+        
+        # Parsed in worker processes and returned in this order (largest files
+        # first); naming, copying and status_queue updates stay on this thread
+        parsed = parse_in_pool([entry.path for entry in pdf_files],
+                               [entry.name for entry in pdf_files], PARSE_CHUNKSIZE)
+        done = 0
+        try:
+            for idx, (entry, result) in enumerate(zip(pdf_files, parsed), 1):
+                done = idx
+                filename, filepath = entry.name, entry.path
                 
-                result.proposed_filename = proposed_name
-                result.target_path = target_path
+                now = time.monotonic()
+                if now - last_progress > PROGRESS_INTERVAL or idx == total:
+                    last_progress = now
+                    self.post_status(('progress', idx, f"Processing {idx} of {total}: {filename[:40]}..."))
                 
-                if not dry_run and result.status != Status.SKIPPED:
-                    copy_error = self.copy_file_safe(filepath, target_path)
-                    if copy_error:
-                        result.reason = f"{result.reason}; Copy failed: {copy_error}"
-                    else:
-                        self.copied_count += 1
+                needs_copy = False
+                try:
+                    proposed_name = namer(filename, result.data)
+                    target_path = calculate_target_path(output_folder, proposed_name, result.data, organize_by_month)
+                    
+                    result.proposed_filename = proposed_name
+                    result.target_path = target_path
+                    
+                    needs_copy = not dry_run and result.status != Status.SKIPPED
+                    
+                except Exception as e:
+                    result = ParseResult(
+                        filename=filename,
+                        status=Status.SKIPPED,
+                        reason=f"Processing error: {str(e)[:80]}",
+                        data={},
+                        proposed_filename="",
+                        target_path=""
+                    )
+                    self.log_error(output_folder, filename, e)
                 
-            except Exception as e:
+                row = self.results.append(result)
+                if needs_copy:
+                    # The copy task reports the row once the copy has finished
+                    copy_futures.append(
+                        self.copy_pool.submit(self.copy_and_report, filepath, result.target_path, result, row)
+                    )
+                else:
+                    self.post_status(('file_done', result))
+        
+        except BrokenProcessPool as e:
+            # A parse process died (crash, OOM kill), taking the rest of the
+            # batch with it. With chunked map the next file in order isn't
+            # necessarily the culprit, so none is named.
+            self.log_error(output_folder, f"(parse pool died after {done} of {total} files)", e)
+            for entry in pdf_files[done:]:
                 result = ParseResult(
-                    filename=filename,
+                    filename=entry.name,
                     status=Status.SKIPPED,
-                    reason=f"Processing error: {str(e)[:80]}",
+                    reason="Processing error: parse pool died before this file finished",
                     data={},
                     proposed_filename="",
                     target_path=""
                 )
-                self.log_error(output_folder, filename, e)
-            
-            self.results.append(result)
-            self.status_queue.put(('file_done', result))
-        
-        self.save_outputs(output_folder, dry_run)
-        self.status_queue.put(('complete', dry_run))
+                self.results.append(result)
+                self.post_status(('file_done', result))
+        finally:
+            parsed.close() # Stops the pool and read-ahead if the loop ended early
+            wait(copy_futures)
+            self.save_outputs(output_folder, dry_run)
+            self.post_status(('complete', dry_run))
+    
+    def copy_and_report(self, source: str, target: str, result: ParseResult, row: int):
+        """Copy-pool task: copies one file, records the outcome and reports the row."""
+        copy_error = self.copy_file_safe(source, target)
+        if copy_error:
+            result.reason = f"{result.reason}; Copy failed: {copy_error}"
+            self.results.reason[row] = result.reason
+        else:
+            with self.copy_lock:
+                self.copied_count += 1
+        self.post_status(('file_done', result))
+    
+    def unique_filepath(self, target: str) -> str:
+        """
+        Appends _1, _2, ... to target until the name is free, resuming from the
+        last suffix used for this target instead of probing from _1 every time.
+        Call with copy_lock held.
+        """
+        n = self._unique_counters.get(target)
+        if n is None:
+            if not os.path.exists(target):
+                self._unique_counters[target] = 0
+                return target
+            n = 0
+        
+        base, ext = os.path.splitext(target)
+        while True:
+            n += 1
+            candidate = f"{base}_{n}{ext}"
+            if not os.path.exists(candidate):
+                break
+        self._unique_counters[target] = n
+        return candidate
     
     def copy_file_safe(self, source: str, target: str) -> Optional[str]:
         """
@@ -477,13 +648,27 @@ class InvFrogApp:
         Returns error message on failure, None on success.
         """
         try:
-            target_unique = get_unique_filepath(target)
-            target_dir = os.path.dirname(target_unique)
-            
-            if not os.path.exists(target_dir):
-                os.makedirs(target_dir, exist_ok=True)
+            with self.copy_lock:
+                # Pick a free name and claim it with an empty placeholder while
+                # holding the lock, so concurrent copies never share a path
+                target_unique = self.unique_filepath(target)
+                target_dir = os.path.dirname(target_unique)
+                
+                if target_dir not in self._created_dirs:
+                    os.makedirs(target_dir, exist_ok=True)
+                    self._created_dirs.add(target_dir)
+                
+                open(target_unique, 'xb').close()
             
-            shutil.copy2(source, target_unique)
+            try:
+                _copy_file(source, target_unique)
+            except Exception:
+                # Don't leave the placeholder behind
+                try:
+                    os.remove(target_unique)
+                except OSError:
+                    pass
+                raise
             return None
             
         except PermissionError:
@@ -494,11 +679,14 @@ class InvFrogApp:
             return f"Copy error: {str(e)[:50]}"
     
     def log_error(self, folder: str, filename: str, exception: Exception):
-        log_path = os.path.join(folder, 'errors.log')
         timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         
         try:
-            with open(log_path, 'a', encoding='utf-8') as f:
+            with self._error_log_lock:
+                if self._error_log is None:
+                    log_path = os.path.join(folder, 'errors.log')
+                    self._error_log = open(log_path, 'a', encoding='utf-8', buffering=64 * 1024)
+                f = self._error_log
                 f.write(f"\n{'='*60}\n")
                 f.write(f"Timestamp: {timestamp}\n")
                 f.write(f"File: {filename}\n")
@@ -507,33 +695,39 @@ class InvFrogApp:
         except:
             pass
     
+    def close_error_log(self):
+        with self._error_log_lock:
+            if self._error_log is not None:
+                try:
+                    self._error_log.close()
+                except OSError:
+                    pass
+                self._error_log = None
+    
     def save_outputs(self, folder: str, dry_run: bool):
         timestamp = datetime.now().strftime('%Y%m%d_%H%M')
         self.last_excel_path = ""
         
-        data_rows = []
-        for r in self.results:
-            row = {
-                'Original_Filename': r.filename,
-                'Proposed_Filename': r.proposed_filename,
-                'Target_Path': r.target_path,
-                'Invoice_Number': r.data.get('invoice_number', ''),
-                'Invoice_Date': r.data.get('date', ''),
-                'Total_Amount': r.data.get('total_amount', ''),
-                'Vendor': r.data.get('vendor', ''),
-                'Status': r.status.value,
-                'Details': r.reason
-            }
-            data_rows.append(row)
-        
-        if data_rows:
-            df = pd.DataFrame(data_rows)
+        if self.results:
             if dry_run:
                 excel_path = os.path.join(folder, f'Preview_{timestamp}.xlsx')
             else:
                 excel_path = os.path.join(folder, f'Invoices_Extracted_{timestamp}.xlsx')
             try:
-                df.to_excel(excel_path, index=False, engine='openpyxl')
+                import xlsxwriter
+                
+                # Rows are written in order, so constant_memory can stream them to disk
+                workbook = xlsxwriter.Workbook(excel_path, {'constant_memory': True})
+                worksheet = workbook.add_worksheet()
+                header_format = workbook.add_format({'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'})
+                worksheet.write_row(0, 0, EXCEL_HEADERS, header_format)
+                r = self.results
+                rows = zip(r.filename, r.proposed_filename, r.target_path,
+                           r.invoice_number, r.date, r.total_amount, r.vendor,
+                           r.status_values(), r.reason)
+                for row_idx, row in enumerate(rows, 1):
+                    worksheet.write_row(row_idx, 0, row)
+                workbook.close()
                 self.last_excel_path = excel_path
             except Exception:
                 pass
@@ -541,61 +735,98 @@ class InvFrogApp:
         if dry_run:
             preview_path = os.path.join(folder, 'preview.csv')
             try:
-                with open(preview_path, 'w', newline='', encoding='utf-8-sig') as f:
+                with open(preview_path, 'w', newline='', encoding='utf-8-sig', buffering=CSV_BUFFER_SIZE) as f:
                     writer = csv.writer(f)
                     writer.writerow(['Original_Filename', 'Proposed_Filename', 'Target_Path', 'Status'])
-                    for r in self.results:
-                        writer.writerow([r.filename, r.proposed_filename, r.target_path, r.status.value])
+                    r = self.results
+                    writer.writerows(zip(r.filename, r.proposed_filename, r.target_path, r.status_values()))
             except Exception:
                 pass
         
-        skipped = [r for r in self.results if r.status == Status.SKIPPED]
+        # Kept for export_error_report so it doesn't rescan the results
+        self.skipped_rows = skipped = self.results.rows_with_status(Status.SKIPPED)
         if skipped:
             csv_path = os.path.join(folder, 'skipped_files.csv')
+            r = self.results
             try:
-                with open(csv_path, 'w', newline='', encoding='utf-8-sig') as f:
+                with open(csv_path, 'w', newline='', encoding='utf-8-sig', buffering=CSV_BUFFER_SIZE) as f:
                     writer = csv.writer(f)
                     writer.writerow(['Filename', 'Reason'])
-                    for r in skipped:
-                        writer.writerow([r.filename, r.reason])
+                    writer.writerows((r.filename[i], r.reason[i]) for i in skipped)
             except Exception:
                 pass
     
+    def post_status(self, msg: tuple):
+        """Queues a message for the GUI thread and wakes it up."""
+        self.status_queue.put(msg)
+        try:
+            self.root.event_generate("<<QueueUpdate>>", when="tail")
+        except (tk.TclError, RuntimeError):
+            # Window is going away; the safety poll (if any) will pick it up
+            pass
+    
     def check_queue(self):
+        self.drain_queue()
+        self.root.after(QUEUE_SAFETY_POLL_MS, self.check_queue)
+    
+    def drain_queue(self):
+        done_results = []
         try:
             while True:
                 msg = self.status_queue.get_nowait()
                 
                 if msg[0] == 'progress':
-                    _, idx, total, filename = msg
+                    _, idx, text = msg
                     self.progress_bar['value'] = idx
-                    self.progress_label.configure(text=f"Processing {idx} of {total}: {filename[:40]}...")
+                    self.progress_label.configure(text=text)
                 
                 elif msg[0] == 'file_done':
-                    result = msg[1]
-                    tag = result.status.value.lower()
-                    self.tree.insert('', 'end', values=(
-                        result.filename[:30] + ('...' if len(result.filename) > 30 else ''),
-                        result.proposed_filename[:35] + ('...' if len(result.proposed_filename) > 35 else ''),
-                        result.data.get('invoice_number', '')[:15],
-                        result.data.get('date', ''),
-                        result.data.get('total_amount', ''),
-                        result.status.value,
-                        result.reason[:40] + ('...' if len(result.reason) > 40 else '')
-                    ), tags=(tag,))
-                    self.tree.yview_moveto(1.0)
+                    done_results.append(msg[1])
                 
                 elif msg[0] == 'complete':
+                    # Rows first, so the table is complete behind the summary dialog
+                    self.insert_results(done_results)
+                    done_results = []
                     dry_run = msg[1]
                     self.finish_processing(dry_run)
         
         except queue.Empty:
             pass
         
-        self.root.after(100, self.check_queue)
+        self.insert_results(done_results)
+    
+    def insert_results(self, results: List[ParseResult]):
+        """Inserts a batch of rows with a single scroll to the end."""
+        if not results:
+            return
+        
+        # Very large bursts: take the tree off screen so it lays out once
+        detach = len(results) > TREE_DETACH_THRESHOLD
+        if detach:
+            self.tree.grid_remove()
+        
+        for result in results:
+            tag = result.status.value.lower()
+            # parse_invoice_data always sets all three keys (possibly None);
+            # skipped files come back with an empty dict
+            inv, dt, tot = _ROW_KEYS(result.data) if result.data else _EMPTY_ROW
+            self.tree.insert('', 'end', values=(
+                _ellip(result.filename, 30),
+                _ellip(result.proposed_filename, 35),
+                (inv or '')[:15],
+                dt or '',
+                tot or '',
+                result.status.value,
+                _ellip(result.reason, 40)
+            ), tags=(tag,))
+        
+        if detach:
+            self.tree.grid()
+        self.tree.yview_moveto(1.0)
     
     def finish_processing(self, dry_run: bool):
         self.is_processing = False
+        self.close_error_log()
         self.extract_btn.configure(state='normal')
         self.browse_input_btn.configure(state='normal')
         self.browse_output_btn.configure(state='normal')
@@ -605,9 +836,9 @@ class InvFrogApp:
         
         self.progress_label.configure(text="Complete!")
         
-        ok_count = sum(1 for r in self.results if r.status == Status.OK)
-        partial_count = sum(1 for r in self.results if r.status == Status.PARTIAL)
-        skipped_count = sum(1 for r in self.results if r.status == Status.SKIPPED)
+        ok_count = self.results.count(Status.OK)
+        partial_count = self.results.count(Status.PARTIAL)
+        skipped_count = self.results.count(Status.SKIPPED)
         total = len(self.results)
         
         if dry_run:
@@ -676,18 +907,14 @@ class InvFrogApp:
         
         if save_path:
             try:
-                with open(save_path, 'w', newline='', encoding='utf-8-sig') as f:
+                with open(save_path, 'w', newline='', encoding='utf-8-sig', buffering=CSV_BUFFER_SIZE) as f:
                     writer = csv.writer(f)
                     writer.writerow(['Original_Filename', 'Proposed_Filename', 'Target_Path',
                                     'Invoice_Number', 'Date', 'Total', 'Status', 'Details'])
-                    for r in self.results:
-                        writer.writerow([
-                            r.filename, r.proposed_filename, r.target_path,
-                            r.data.get('invoice_number', ''),
-                            r.data.get('date', ''),
-                            r.data.get('total_amount', ''),
-                            r.status.value, r.reason
-                        ])
+                    r = self.results
+                    writer.writerows(zip(r.filename, r.proposed_filename, r.target_path,
+                                         r.invoice_number, r.date, r.total_amount,
+                                         r.status_values(), r.reason))
                 messagebox.showinfo("Saved", f"Preview CSV saved to:\n{save_path}")
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to save: {e}")
@@ -697,7 +924,7 @@ class InvFrogApp:
             messagebox.showinfo("No Data", "No results available.")
             return
         
-        skipped = [r for r in self.results if r.status == Status.SKIPPED]
+        skipped = self.skipped_rows
         if not skipped:
             messagebox.showinfo("No Errors", "No skipped files to report.")
             return
@@ -712,17 +939,20 @@ class InvFrogApp:
         
         if save_path:
             try:
-                with open(save_path, 'w', newline='', encoding='utf-8-sig') as f:
+                with open(save_path, 'w', newline='', encoding='utf-8-sig', buffering=CSV_BUFFER_SIZE) as f:
                     writer = csv.writer(f)
                     writer.writerow(['Filename', 'Reason'])
-                    for r in skipped:
-                        writer.writerow([r.filename, r.reason])
+                    r = self.results
+                    writer.writerows((r.filename[i], r.reason[i]) for i in skipped)
                 messagebox.showinfo("Saved", f"Error report saved to:\n{save_path}")
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to save: {e}")
 
 
 def main():
+    # Warm up PIL (used for the splash and logo) while Tk initializes
+    threading.Thread(target=lambda: __import__('PIL.ImageTk'), daemon=True).start()
+    
     try:
         splash = SplashScreen()
         splash.run()
@@ -750,4 +980,5 @@ def main():
 
 
 if __name__ == '__main__':
+    multiprocessing.freeze_support() # See parser.parse_in_pool
     main()
@@ -5,12 +5,15 @@ Extracts text from PDFs and handles filename generation logic.
 
 import re
 import os
+import sys
 import shutil
-import pdfplumber
+import threading
 from datetime import datetime
-from typing import Optional, Dict, Any, Tuple
-from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Iterator, List, Optional, Dict, Any, Tuple
+from dataclasses import dataclass, field
 from enum import Enum
+from concurrent.futures import ProcessPoolExecutor
 
 class Status(Enum):
     OK = "OK"
@@ -30,42 +33,231 @@ class ParseResult:
     data: Dict[str, Any]
     proposed_filename: str = ""
     target_path: str = ""
+    is_preview: bool = False  # Dry run: target_path is where the file WOULD go
+    # Copies of the most-read fields in `data`, for plain attribute access
+    invoice_number: Optional[str] = None
+    date: Optional[str] = None
+    total_amount: Optional[str] = None
+
+# Status <-> one-byte code, for BatchResults.status
+STATUS_CODES = {Status.OK: 0, Status.PARTIAL: 1, Status.SKIPPED: 2}
+STATUS_BY_CODE = (Status.OK, Status.PARTIAL, Status.SKIPPED)
+_STATUS_VALUES = tuple(s.value for s in STATUS_BY_CODE)
+
+@dataclass
+class BatchResults:
+    """
+    A whole batch stored column-wise: one list per field, plus statuses packed
+    into a bytearray of STATUS_CODES. Avoids keeping a ParseResult and its
+    data dict alive per file for the reports and summary.
+    """
+    filename: List[str] = field(default_factory=list)
+    proposed_filename: List[str] = field(default_factory=list)
+    target_path: List[str] = field(default_factory=list)
+    invoice_number: List[Optional[str]] = field(default_factory=list)
+    date: List[Optional[str]] = field(default_factory=list)
+    total_amount: List[Optional[str]] = field(default_factory=list)
+    vendor: List[Optional[str]] = field(default_factory=list)
+    status: bytearray = field(default_factory=bytearray)
+    reason: List[str] = field(default_factory=list)
+
+    def append(self, r: ParseResult) -> int:
+        """Adds one result; returns its row index."""
+        data = r.data
+        self.filename.append(r.filename)
+        self.proposed_filename.append(r.proposed_filename)
+        self.target_path.append(r.target_path)
+        self.invoice_number.append(data.get('invoice_number'))
+        self.date.append(data.get('date'))
+        self.total_amount.append(data.get('total_amount'))
+        self.vendor.append(data.get('vendor'))
+        self.status.append(STATUS_CODES[r.status])
+        self.reason.append(r.reason)
+        return len(self.filename) - 1
+
+    def __len__(self) -> int:
+        return len(self.filename)
+
+    def count(self, status: Status) -> int:
+        return self.status.count(STATUS_CODES[status])
+
+    def status_values(self) -> Iterator[str]:
+        """Status display strings ("OK", ...) in row order."""
+        return map(_STATUS_VALUES.__getitem__, self.status)
+
+    def rows_with_status(self, status: Status) -> List[int]:
+        code = STATUS_CODES[status]
+        return [i for i, c in enumerate(self.status) if c == code]
 
 # Configuration
 MAX_FILENAME_LENGTH = 200
-ILLEGAL_CHARS = r'[\\/:*?"<>|]'
+# Characters not allowed in Windows filenames, all mapped to '_'
+_ILLEGAL_TABLE = str.maketrans({c: '_' for c in '\\/:*?"<>|'})
+# Same mapping as a 256-byte lookup table, for the (common) pure-ASCII names
+_ILLEGAL_LUT = bytes(ord('_') if chr(i) in '\\/:*?"<>|' else i for i in range(256))
+
+# Patterns compiled once at import; field patterns are tried in order.
+# Each carries a literal it can't match without (checked against the lowercased
+# text first, so a pattern with no chance skips its regex scan), or None.
+_RE_INV = [
+    (re.compile(r'(?:Invoice\s*(?:No\.?|Number|#)\s*[:\s]*)\s*([A-Za-z0-9\-_/]{2,})', re.IGNORECASE), 'invoice'),
+    (re.compile(r'#\s*(\d{4,})', re.IGNORECASE), '#'),
+]
+_RE_DATE = [
+    (re.compile(r'(?:Date)[\s:]*(\d{1,2}[\/\-\.]\d{1,2}[\/\-\.]\d{2,4})', re.IGNORECASE), 'date'),
+    (re.compile(r'(\d{4}[\/\-\.]\d{1,2}[\/\-\.]\d{1,2})', re.IGNORECASE), None),
+    (re.compile(r'([A-Za-z]{3,9}\s+\d{1,2},?\s+\d{4})', re.IGNORECASE), None),
+]
+_RE_AMOUNT = re.compile(r'[\d,]+\.\d{2}')
+# All vendor keywords in one pass over the header, instead of one `in` per keyword
+# (matched against lowercased text; plain literals scan faster than IGNORECASE)
+_RE_VENDOR_KW = re.compile(r'inc|llc|ltd|gmbh|corp')
+_RE_CR = re.compile(r'\r')
+_RE_NONDIGIT = re.compile(r'[^0-9]')
+_RE_YEAR = re.compile(r'20\d{2}')
+_RE_DIGIT = re.compile(r'\d')
 
 # --- Core Extraction Logic ---
 
+def _check_text(text: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    if not text or len(text.strip()) < 20:
+        return None, "Scanned PDF - unsupported"
+    return text, None
+
+# PyMuPDF module once imported, False if it isn't installed. Imported on first
+# use so only the parse processes pay for it, not the GUI's startup.
+_PYMUPDF = None
+
+def _pymupdf():
+    global _PYMUPDF
+    if _PYMUPDF is None:
+        try:
+            import pymupdf  # Much faster than pdfminer for plain page text
+            _PYMUPDF = pymupdf
+        except ImportError:
+            _PYMUPDF = False
+    return _PYMUPDF
+
 def extract_text_from_pdf(filepath: str) -> Tuple[Optional[str], Optional[str]]:
     """Extracts text from first page. Returns (text, error_message)."""
+    pymupdf = _pymupdf()
+    if pymupdf:
+        try:
+            doc = pymupdf.open(filepath)
+        except Exception:
+            doc = None  # Not something MuPDF can open; let pdfminer try
+        if doc is not None:
+            try:
+                if doc.needs_pass:
+                    return None, "Encrypted/Password Protected"
+                if doc.page_count == 0:
+                    return None, "Empty PDF"
+                return _check_text(doc.load_page(0).get_text("text"))
+            except Exception as e:
+                return None, f"Read Error: {str(e)[:50]}"
+            finally:
+                doc.close()
+    return _extract_text_pdfminer(filepath)
+
+def _extract_text_pdfminer(filepath: str) -> Tuple[Optional[str], Optional[str]]:
+    # Fallback only; pdfminer is a heavy import. Plain pdfminer skips the
+    # char/word model pdfplumber builds on top of it.
+    from io import StringIO
+    from pdfminer.converter import TextConverter
+    from pdfminer.layout import LAParams
+    from pdfminer.pdfdocument import PDFPasswordIncorrect, PDFEncryptionError
+    from pdfminer.pdfinterp import PDFResourceManager, PDFPageInterpreter
+    from pdfminer.pdfpage import PDFPage
     try:
-        with pdfplumber.open(filepath) as pdf:
-            if not pdf.pages:
+        with open(filepath, 'rb') as fp, StringIO() as out:
+            page = next(PDFPage.get_pages(fp, maxpages=1), None)
+            if page is None:
                 return None, "Empty PDF"
-            text = pdf.pages[0].extract_text()
-            if not text or len(text.strip()) < 20:
-                return None, "Scanned PDF - unsupported"
-            return text, None
+            # Per file: its font cache is keyed by object id, and those repeat across documents
+            rsrcmgr = PDFResourceManager(caching=True)
+            # Layout analysis stays on: with laparams=None pdfminer drops the
+            # line breaks the total/vendor heuristics depend on
+            device = TextConverter(rsrcmgr, out, laparams=LAParams())
+            PDFPageInterpreter(rsrcmgr, device).process_page(page)
+            device.close()
+            return _check_text(out.getvalue())
+    except (PDFPasswordIncorrect, PDFEncryptionError):
+        return None, "Encrypted/Password Protected"
     except Exception as e:
         err = str(e).lower()
         if 'password' in err: return None, "Encrypted/Password Protected"
         return None, f"Read Error: {str(e)[:50]}"
 
+def _find_total(text: str, low: str) -> Optional[str]:
+    """
+    Last amount on the first line mentioning "total" but not "sub" (Subtotal).
+    Jumps between "total" hits in the lowercased text (low) with str.find
+    instead of splitting and lowercasing every line.
+    """
+    if len(low) != len(text):
+        # Rare: lowercasing changed the length, so offsets don't line up. Go line by line.
+        for line in text.split('\n'):
+            low = line.lower()
+            if 'total' in low and 'sub' not in low:
+                amounts = _RE_AMOUNT.findall(line)
+                if amounts:
+                    return amounts[-1]
+        return None
+    
+    pos = low.find('total')
+    while pos != -1:
+        start = low.rfind('\n', 0, pos) + 1
+        end = low.find('\n', pos)
+        if end == -1:
+            end = len(low)
+        if low.find('sub', start, end) == -1:
+            # Find last number in line usually
+            amounts = _RE_AMOUNT.findall(text, start, end)
+            if amounts:
+                return amounts[-1] # Take the last one (often the total)
+        pos = low.find('total', end)
+    return None
+
+# Invoice number and date sit near the top; search this many characters first
+HEAD_CHARS = 4096
+
+def _search_head(p: re.Pattern, head: str, text: str) -> Optional[re.Match]:
+    """First match of p, trying the head slice before the whole text."""
+    m = p.search(head)
+    if m is None and head is not text:
+        m = p.search(text)
+    return m
+
 def parse_invoice_data(text: str) -> Dict[str, Any]:
     """Heuristic extraction of fields."""
     # Normalize
-    text = re.sub(r'\r', '\n', text)
+    text = _RE_CR.sub('\n', text)
     
-    data = {'invoice_number': None, 'date': None, 'total_amount': None, 'vendor': None}
+    data = {'invoice_number': None, 'date': None, 'total_amount': None, 'vendor': None, 'date_obj': None}
+    
+    low = text.lower()
+    # The literal checks on low only hold when lowercasing maps char for char:
+    # IGNORECASE matches 'İ' to 'i' (lower() gives two chars) and 'ı' to 'i'
+    # (lower() keeps it as is)
+    use_prefilter = len(low) == len(text) and 'ı' not in low
+    # Dates, totals and '#1234' numbers all need a digit; near-empty scans
+    # often have none, so those regexes are skipped outright
+    has_digits = _RE_DIGIT.search(text) is not None
+    # Cut the head on a line break: no pattern spans one at its end, so a
+    # match in the head is exactly the first match in the full text
+    head = text
+    if len(text) > HEAD_CHARS:
+        cut = text.rfind('\n', 0, HEAD_CHARS)
+        if cut > 0:
+            head = text[:cut]
     
     # 1. Invoice Number
-    inv_patterns = [
-        r'(?:Invoice\s*(?:No\.?|Number|#)\s*[:\s]*)\s*([A-Za-z0-9\-_/]{2,})',
-        r'#\s*(\d{4,})'
-    ]
-    for p in inv_patterns:
-        m = re.search(p, text, re.IGNORECASE)
+    for p, needle in _RE_INV:
+        if needle and use_prefilter and needle not in low:
+            continue
+        if needle == '#' and not has_digits:
+            continue
+        m = _search_head(p, head, text)
         if m:
             val = m.group(1).strip()
             if val.lower() not in ['date', 'no', 'number']:
@@ -73,13 +265,10 @@ def parse_invoice_data(text: str) -> Dict[str, Any]:
                 break
     
     # 2. Date
-    date_patterns = [
-        r'(?:Date)[\s:]*(\d{1,2}[\/\-\.]\d{1,2}[\/\-\.]\d{2,4})',
-        r'(\d{4}[\/\-\.]\d{1,2}[\/\-\.]\d{1,2})',
-        r'([A-Za-z]{3,9}\s+\d{1,2},?\s+\d{4})'
-    ]
-    for p in date_patterns:
-        m = re.search(p, text, re.IGNORECASE)
+    for p, needle in (_RE_DATE if has_digits else ()):
+        if needle and use_prefilter and needle not in low:
+            continue
+        m = _search_head(p, head, text)
         if m:
             try:
                 # Basic normalization attempt
@@ -87,24 +276,35 @@ def parse_invoice_data(text: str) -> Dict[str, Any]:
                 data['date'] = dstr 
                 break
             except: pass
+    # Parsed once here so naming and month folders don't each re-parse the string
+    data['date_obj'] = _parse_date(data['date'])
 
     # 3. Total Amount (Simplified Heuristic)
-    # Look for "Total" followed by number, excluding "Subtotal"
-    lines = text.split('\n')
-    for line in lines:
-        if 'total' in line.lower() and 'sub' not in line.lower():
-            # Find last number in line usually
-            amounts = re.findall(r'[\d,]+\.\d{2}', line)
-            if amounts:
-                data['total_amount'] = amounts[-1] # Take the last one (often the total)
-                break
+    if has_digits:
+        data['total_amount'] = _find_total(text, low)
     
     # 4. Vendor (Very basic check for demonstration)
-    vendor_keywords = ['inc', 'llc', 'ltd', 'gmbh', 'corp']
-    for i, line in enumerate(lines[:5]): # Check header
-        if any(k in line.lower() for k in vendor_keywords):
-            data['vendor'] = line.strip()
+    # First line of the header (5 lines) containing any keyword
+    header_end = -1
+    for _ in range(5):
+        header_end = text.find('\n', header_end + 1)
+        if header_end == -1:
+            header_end = len(text)
             break
+    header = text[:header_end]
+    header_low = header.lower()
+    m = _RE_VENDOR_KW.search(header_low)
+    if m:
+        pos = m.start()
+        if len(header_low) == len(header):
+            # Slice the matching line out directly instead of splitting the header
+            start = header_low.rfind('\n', 0, pos) + 1
+            end = header_low.find('\n', pos)
+            data['vendor'] = header[start:end if end != -1 else len(header)].strip()
+        else:
+            # Index by line number; lower() can change string length for some characters
+            line_no = header_low.count('\n', 0, pos)
+            data['vendor'] = header.split('\n')[line_no].strip()
 
     return data
 
@@ -117,7 +317,7 @@ def process_single_pdf(filepath: str, filename: str) -> ParseResult:
     data = parse_invoice_data(text)
     
     # Determine Status
-    missing = [k for k, v in data.items() if not v and k != 'vendor']
+    missing = [k for k in ('invoice_number', 'date', 'total_amount') if not data[k]]
     if not missing:
         status = Status.OK
         reason = "All fields found"
@@ -128,75 +328,220 @@ def process_single_pdf(filepath: str, filename: str) -> ParseResult:
         status = Status.PARTIAL
         reason = "Low confidence extraction"
         
-    return ParseResult(filename, status, reason, data)
+    return ParseResult(
+        filename, status, reason, data,
+        invoice_number=data['invoice_number'],
+        date=data['date'],
+        total_amount=data['total_amount']
+    )
+
+def process_single_pdf_safe(filepath: str, filename: str) -> ParseResult:
+    """process_single_pdf for process pools: never raises, so one bad file can't break a map()."""
+    try:
+        return process_single_pdf(filepath, filename)
+    except Exception as e:
+        return ParseResult(filename, Status.SKIPPED, f"Read Error: {str(e)[:50]}", {})
+
+# Files handed to a parse process per round trip
+PARSE_CHUNKSIZE = 4
+
+# How many files the read-ahead may get ahead of the ones handed to the parse
+# workers. Much further and it evicts its own earlier reads and competes with
+# the pool for the disk.
+PREFETCH_WINDOW = 32
+
+def pool_workers() -> int:
+    """Worker count a default ProcessPoolExecutor() starts."""
+    n = getattr(os, 'process_cpu_count', os.cpu_count)() or 1
+    # The executor caps it at 61 on Windows
+    return min(n, 61) if sys.platform == 'win32' else n
+
+def _read_ahead(path: str):
+    try:
+        with open(path, 'rb') as f:
+            if hasattr(os, 'posix_fadvise'):
+                # Let the kernel read it in the background
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+            else:
+                while f.read(1024 * 1024):
+                    pass
+    except OSError:
+        pass
+
+class Prefetcher:
+    """
+    Pulls files into the OS cache on a background thread, in the order they'll
+    be parsed, staying at most `window` files ahead of the caller.
+    Call advance() as each file's result is consumed and stop() when the run ends.
+    """
+    def __init__(self, paths: List[str], window: int = PREFETCH_WINDOW):
+        self._slots = threading.Semaphore(window)
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(list(paths),), daemon=True)
+        self._thread.start()
+    
+    def _run(self, paths: List[str]):
+        for path in paths:
+            self._slots.acquire()
+            if self._stopped.is_set():
+                return
+            _read_ahead(path)
+    
+    def advance(self):
+        self._slots.release()
+    
+    def stop(self):
+        self._stopped.set()
+        self._slots.release() # Wake the thread if it's waiting for a slot
+
+def prefetch_files(paths: List[str], chunksize: int) -> Prefetcher:
+    """
+    Starts reading paths ahead of a default process pool mapping over them in
+    chunks of chunksize; advance() the result per result consumed. The pool has
+    up to one chunk per worker plus one queued beyond the result being
+    consumed, so the window starts past those files.
+    """
+    return Prefetcher(paths, PREFETCH_WINDOW + (pool_workers() + 1) * chunksize)
+
+def parse_in_pool(paths: List[str], names: List[str],
+                  chunksize: int = PARSE_CHUNKSIZE) -> Iterator[ParseResult]:
+    """
+    Parses the files in a default process pool (parsing is CPU-bound), with the
+    disk reads prefetched ahead of it, and yields the results in input order.
+    Only ParseResults cross the process boundary. If a worker process dies,
+    BrokenProcessPool is raised once the results before its chunk are out.
+
+    Frozen (PyInstaller) builds on every OS must call
+    multiprocessing.freeze_support() first thing in __main__, or each worker
+    process starts another copy of the app instead.
+    """
+    prefetch = prefetch_files(paths, chunksize)
+    try:
+        with ProcessPoolExecutor() as ex:
+            for result in ex.map(process_single_pdf_safe, paths, names, chunksize=chunksize):
+                prefetch.advance()
+                yield result
+    finally:
+        prefetch.stop()
 
 # --- Organizer & Renaming Logic ---
 
+@lru_cache(maxsize=4096)
 def sanitize_filename(name: str) -> str:
     """Removes illegal characters."""
     if not name: return "unknown"
-    name = re.sub(ILLEGAL_CHARS, '_', name)
+    if name.isascii():
+        name = name.encode('ascii').translate(_ILLEGAL_LUT).decode('ascii')
+    else:
+        name = name.translate(_ILLEGAL_TABLE)
     return name.strip()[:MAX_FILENAME_LENGTH]
 
+# Date shapes and the standard formats (as found in the Excel/CSV output) that
+# can parse them. Day fields may be space-padded, as strptime's %d allows.
+_FMT_PICK = [
+    (re.compile(r'\d{4}-\d{1,2}-[\d ]{1,2}'), ('%Y-%m-%d',)),
+    (re.compile(r'\d{1,2}/[\d ]{1,2}/\d{4}'), ('%m/%d/%Y', '%d/%m/%Y')),
+    (re.compile(r' \d/\d{1,2}/\d{4}'), ('%d/%m/%Y',)),
+    (re.compile(r'\d{4}/\d{1,2}/[\d ]{1,2}'), ('%Y/%m/%d',)),
+    # Only full YYYYMMDD; shorter runs (YYMMDD, stray numbers) stay unparsed
+    (re.compile(r'\d{8}'), ('%Y%m%d',)),
+]
+
+def _parse_date(raw_date: Any) -> Optional[datetime]:
+    """Parses a date string into a real date object. None if no format fits."""
+    if not raw_date or not isinstance(raw_date, str):
+        return None
+    # Pick the candidate formats by shape so a non-matching strptime (and its
+    # ValueError) is only tried for ambiguous M/D vs D/M strings
+    fmts = next((f for r, f in _FMT_PICK if r.fullmatch(raw_date)), ())
+    for fmt in fmts:
+        try:
+            return datetime.strptime(raw_date, fmt)
+        except ValueError:
+            continue
+    return None
+
+def _date_obj(data: Dict[str, Any]) -> Optional[datetime]:
+    # parse_invoice_data fills in 'date_obj' (possibly None); other dicts get parsed here
+    if 'date_obj' in data:
+        return data['date_obj']
+    return _parse_date(data.get('date'))
+
+def _format_date(data: Dict[str, Any]) -> str:
+    """Normalizes the extracted date to YYYYMMDD. Empty string if unusable."""
+    # We want YYYYMMDD (e.g. 20120301) not 132012
+    dt = _date_obj(data)
+    if dt:
+        return dt.strftime("%Y%m%d") # Result: 20120301
+    
+    # If standard parsing failed, just use the raw numbers but limit length
+    raw_date = data.get('date', '')
+    if raw_date and isinstance(raw_date, str):
+        nums = _RE_NONDIGIT.sub('', raw_date)
+        if len(nums) >= 6: return nums[:8]
+    return ""
+
+def _build_name(*parts) -> str:
+    # Filter out empty parts so we don't get double underscores
+    return "_".join(filter(None, parts)) + ".pdf"
+
+def _name_by_invoice(original_filename: str, data: Dict[str, Any]) -> str:
+    inv = sanitize_filename(data.get('invoice_number') or '')
+    if inv and inv != "unknown":
+        # Result: INV_47905_20120301.pdf
+        return _build_name("INV", inv, _format_date(data))
+    orig_base = os.path.splitext(original_filename)[0]
+    return _build_name("INV_unknown", sanitize_filename(orig_base))
+
+def _name_by_vendor(original_filename: str, data: Dict[str, Any]) -> str:
+    vendor = sanitize_filename(data.get('vendor') or "Unknown_Vendor")
+    inv = sanitize_filename(data.get('invoice_number') or '')
+    return _build_name(vendor, "INV", inv, _format_date(data))
+
+def _name_by_original(original_filename: str, data: Dict[str, Any]) -> str:
+    orig_base = sanitize_filename(os.path.splitext(original_filename)[0])
+    date_formatted = _format_date(data)
+    if date_formatted:
+        return f"{date_formatted}_{orig_base}.pdf"
+    return f"{orig_base}.pdf"
+
+_SCHEME_BUILDERS = {
+    NamingScheme.INVOICE_NUMBER: _name_by_invoice,
+    NamingScheme.VENDOR_NAME: _name_by_vendor,
+    NamingScheme.ORIGINAL_FILENAME: _name_by_original,
+}
+
+def make_namer(scheme: NamingScheme) -> Callable[[str, Dict[str, Any]], str]:
+    """
+    Returns the filename builder for one scheme, for batch loops where the
+    scheme is fixed: no per-file scheme lookup or cache-key building.
+    """
+    builder = _SCHEME_BUILDERS.get(scheme)
+    if builder is None:
+        return lambda original_filename, data: original_filename
+    return builder
+
 def generate_proposed_filename(
     original_filename: str, 
     data: Dict[str, Any], 
     scheme: NamingScheme
 ) -> str:
     """Generates the new filename string (without path)."""
-    
-    # Helpers
-    inv = sanitize_filename(data.get('invoice_number'))
-    vendor = sanitize_filename(data.get('vendor') or "Unknown_Vendor")
-    orig_base = os.path.splitext(original_filename)[0]
-    
-     # --- DATE FIX START ---
-    # We want YYYYMMDD (e.g. 20120301) not 132012
-    raw_date = data.get('date', '')
-    date_formatted = ""
-    
-    if raw_date:
-        try:
-            # Try to parse the date string into a real date object
-            # We try standard formats found in the Excel/CSV output
-            for fmt in ['%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y', '%Y/%m/%d']:
-                try:
-                    dt = datetime.strptime(raw_date, fmt)
-                    date_formatted = dt.strftime("%Y%m%d") # Result: 20120301
-                    break
-                except ValueError:
-                    continue
-            
-            # If standard parsing failed, just use the raw numbers but limit length
-            if not date_formatted:
-                nums = re.sub(r'[^0-9]', '', raw_date)
-                if len(nums) >= 6: date_formatted = nums[:8]
-                
-        except:
-            pass
-    ext = ".pdf"
-    
-    # Helper to build name parts
-    def build_name(*parts):
-        # Filter out empty parts so we don't get double underscores
-        return "_".join(filter(None, parts)) + ext  
-
-    if scheme == NamingScheme.INVOICE_NUMBER:
-        if inv and inv != "unknown":
-            # Result: INV_47905_20120301.pdf
-            return build_name("INV", inv, date_formatted)
-        else:
-            return build_name("INV_unknown", sanitize_filename(orig_base))
-            
-    elif scheme == NamingScheme.VENDOR_NAME:
-        return build_name(vendor, "INV", inv, date_formatted)
-        
-    elif scheme == NamingScheme.ORIGINAL_FILENAME:
-        if date_formatted:
-            return f"{date_formatted}_{sanitize_filename(orig_base)}{ext}"
-        return f"{sanitize_filename(orig_base)}{ext}"
-    
-    return original_filename
+    try:
+        key = tuple(sorted(data.items()))
+        hash(key)
+    except TypeError:
+        # Unhashable/unorderable values; just compute it
+        return _generate_proposed_filename(original_filename, data, scheme)
+    return _cached_proposed_filename(original_filename, key, scheme)
+
+@lru_cache(maxsize=4096)
+def _cached_proposed_filename(original_filename: str, data_items: tuple, scheme: NamingScheme) -> str:
+    # Repeat inputs (re-runs, duplicate invoices) skip the sanitizing work
+    return _generate_proposed_filename(original_filename, dict(data_items), scheme)
+
+def _generate_proposed_filename(original_filename: str, data: Dict[str, Any], scheme: NamingScheme) -> str:
+    return make_namer(scheme)(original_filename, data)
 
 def calculate_target_path(
     base_output_folder: str,
@@ -213,30 +558,62 @@ def calculate_target_path(
     
     # 2. Date Folder (Optional)
     if organize_by_month:
-        date_str = data.get('date', '')
-        # Try to extract YYYY-MM. Crude heuristic for demo:
-        # If date is 2023-01-01 or 01/01/2023
         year_month = "Unknown_Date"
-        try:
-            # Look for 4 digits
-            m = re.search(r'20\d{2}', date_str)
-            if m: year_month = m.group(0) # Just year for safety if parsing fails
-        except: pass
+        dt = _date_obj(data)
+        if dt:
+            year_month = dt.strftime("%Y-%m")
+        else:
+            # Crude heuristic: look for 4 digits
+            try:
+                m = _RE_YEAR.search(data.get('date', ''))
+                if m: year_month = m.group(0) # Just year for safety if parsing fails
+            except: pass
         subfolders.append(year_month)
     
     subfolders.append(vendor)
     
     return os.path.join(base_output_folder, *subfolders, filename)
 
+# Directory -> names known to be taken there (normcased), so a batch lists each
+# target folder at most once. Call reset_dir_cache() at the start of a batch.
+_DIR_CACHE: Dict[str, set] = {}
+_DIR_CACHE_LOCK = threading.Lock()
+
+def reset_dir_cache():
+    with _DIR_CACHE_LOCK:
+        _DIR_CACHE.clear()
+
 def get_safe_unique_path(target_path: str) -> str:
-    """If file exists, appends _1, _2 etc."""
-    if not os.path.exists(target_path):
-        return target_path
+    """
+    Returns target_path, or target_path with _1, _2 etc. appended if that name is
+    taken on disk or was already handed out since the last reset_dir_cache().
+    Calling it twice for the same free target gives x.pdf, then x_1.pdf.
+    """
+    folder, fname = os.path.split(target_path)
+    key = os.path.normcase(folder or '.')
+    
+    with _DIR_CACHE_LOCK:
+        existing = _DIR_CACHE.get(key)
+        if existing is None:
+            try:
+                with os.scandir(folder or '.') as it:
+                    existing = {os.path.normcase(e.name) for e in it}
+            except FileNotFoundError:
+                existing = set() # Not created yet
+            _DIR_CACHE[key] = existing
+        
+        # The listing skips most probes, but it can be stale (files created since)
+        # and normcase doesn't fold case on macOS, so confirm the pick on disk too
+        name = fname
+        base, ext = os.path.splitext(fname)
+        counter = 0
+        while os.path.normcase(name) in existing or os.path.exists(os.path.join(folder, name)):
+            counter += 1
+            name = f"{base}_{counter}{ext}"
         
-    base, ext = os.path.splitext(target_path)
-    counter = 1
-    while True:
-        new_path = f"{base}_{counter}{ext}"
-        if not os.path.exists(new_path):
-            return new_path
-        counter += 1
\ No newline at end of file
+        # Claim it, so the next file headed for this folder can't pick it too
+        existing.add(os.path.normcase(name))
+    
+    if name is fname:
+        return target_path
+    return os.path.join(folder, name)
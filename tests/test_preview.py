@@ -1,11 +1,12 @@
 """
 Simple test script to verify parser logic without GUI.
 """
-import os, sys
+import os, sys, random
+from datetime import datetime
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import parser
-from parser import NamingScheme
+from parser import NamingScheme, ParseResult, Status
 
 
 def test_filename_generation():
@@ -48,4 +49,123 @@ def test_path_calculation():
     assert "2023-10" in path
 
     path = parser.calculate_target_path("C:/Out", "file.pdf", mock_data, organize_by_month=False)
-    assert "2023-10" not in path
\ No newline at end of file
+    assert "2023-10" not in path
+
+def test_filename_generation_cached():
+    mock_data = {'invoice_number': 'INV-999', 'date': '2023-10-25', 'vendor': 'Acme Corp'}
+
+    first = parser.generate_proposed_filename("scan001.pdf", mock_data, NamingScheme.VENDOR_NAME)
+    second = parser.generate_proposed_filename("scan001.pdf", dict(mock_data), NamingScheme.VENDOR_NAME)
+    assert first == second == "Acme Corp_INV_INV-999_20231025.pdf"
+
+    # Different data for the same file name must not get the earlier answer back
+    other = parser.generate_proposed_filename("scan001.pdf", {**mock_data, 'vendor': 'Other Ltd'}, NamingScheme.VENDOR_NAME)
+    assert other == "Other Ltd_INV_INV-999_20231025.pdf"
+
+    # Unhashable values bypass the cache instead of failing
+    name = parser.generate_proposed_filename("scan001.pdf", {**mock_data, 'extra': []}, NamingScheme.INVOICE_NUMBER)
+    assert name == "INV_INV-999_20231025.pdf"
+
+def test_safe_unique_path(tmp_path):
+    parser.reset_dir_cache()
+    (tmp_path / "a.pdf").write_bytes(b"")
+    assert parser.get_safe_unique_path(str(tmp_path / "a.pdf")) == str(tmp_path / "a_1.pdf")
+
+    # Names handed out are claimed until the cache is reset
+    assert parser.get_safe_unique_path(str(tmp_path / "b.pdf")) == str(tmp_path / "b.pdf")
+    assert parser.get_safe_unique_path(str(tmp_path / "b.pdf")) == str(tmp_path / "b_1.pdf")
+
+    # Files created after the folder was listed are still seen
+    (tmp_path / "c.pdf").write_bytes(b"")
+    assert parser.get_safe_unique_path(str(tmp_path / "c.pdf")) == str(tmp_path / "c_1.pdf")
+
+    parser.reset_dir_cache()
+    assert parser.get_safe_unique_path(str(tmp_path / "b.pdf")) == str(tmp_path / "b.pdf")
+
+def test_prefilter_keeps_ignorecase_matches():
+    # IGNORECASE matches these to 'i'; lowercasing doesn't, so no literal prefilter
+    for word in ("İNVOICE", "ınvoıce"):
+        data = parser.parse_invoice_data(f"{word} No: AB1234\nTotal 10.00")
+        assert data['invoice_number'] == 'AB1234'
+
+def test_parse_date():
+    assert parser._parse_date('2023-10-25') == datetime(2023, 10, 25)
+    assert parser._parse_date('20231025') == datetime(2023, 10, 25)
+    # M/D first, D/M when the month can't be
+    assert parser._parse_date('10/02/2023') == datetime(2023, 10, 2)
+    assert parser._parse_date('25/10/2023') == datetime(2023, 10, 25)
+    # Short digit runs aren't dates; they keep their raw digits and no month folder
+    for raw in ('563244', '231025', '10-25-2023', 'Oct 25, 2023', None):
+        assert parser._parse_date(raw) is None
+    path = parser.calculate_target_path("out", "f.pdf", {'date': '231025'}, organize_by_month=True)
+    assert "Unknown_Date" in path
+
+def test_find_total():
+    text = "Subtotal 90.00\nTax 10.00\nTotal: 1,000.00 USD 100.00\nTotal due 5.00"
+    # First "total" line that isn't a subtotal, last amount on it
+    assert parser._find_total(text, text.lower()) == "100.00"
+    assert parser._find_total("Subtotal 5.00", "subtotal 5.00") is None
+    # lower() changing the length takes the line-by-line path
+    text = "İ Total 7.50"
+    assert parser._find_total(text, text.lower()) == "7.50"
+
+def test_make_namer_matches_generate():
+    data = {'invoice_number': 'A/1', 'date': '25/10/2023', 'vendor': 'Acme: Inc'}
+    for scheme in NamingScheme:
+        assert parser.make_namer(scheme)("scan.pdf", data) == parser.generate_proposed_filename("scan.pdf", data, scheme)
+
+def test_batch_results():
+    results = parser.BatchResults()
+    ok = ParseResult("a.pdf", Status.OK, "All fields found", {'invoice_number': '1', 'vendor': 'Acme Inc'})
+    skipped = ParseResult("b.pdf", Status.SKIPPED, "Empty PDF", {})
+    assert results.append(ok) == 0
+    assert results.append(skipped) == 1
+    assert len(results) == 2
+    assert results.count(Status.SKIPPED) == 1
+    assert list(results.status_values()) == ["OK", "SKIPPED"]
+    assert results.rows_with_status(Status.SKIPPED) == [1]
+    assert results.vendor == ['Acme Inc', None]
+
+def _reference_fields(text):
+    # Plain full-text scans of every pattern, with none of parse_invoice_data's shortcuts
+    text = text.replace('\r', '\n')
+    inv = date = None
+    for p, _ in parser._RE_INV:
+        m = p.search(text)
+        if m and m.group(1).strip().lower() not in ['date', 'no', 'number']:
+            inv = m.group(1).strip()
+            break
+    for p, _ in parser._RE_DATE:
+        m = p.search(text)
+        if m:
+            date = m.group(1).replace('/', '-').replace('.', '-')
+            break
+    return inv, date
+
+def test_parse_fast_paths_match_full_scan():
+    rng = random.Random(1234)
+    pieces = ["Invoice No: AB-12", "INVOICE # 55123", "İNVOICE No: Q9", "ınvoıce Number ZZ1",
+              "#99812", "Date: 1/2/2023", "2023-10-05", "March 15, 2023", "Total 3.00",
+              "Acme Inc", "no", "x" * 400, "\n", "\n", "\r\n", " "]
+    for _ in range(400):
+        text = "".join(rng.choice(pieces) for _ in range(rng.randint(1, 300)))
+        data = parser.parse_invoice_data(text)
+        assert (data['invoice_number'], data['date']) == _reference_fields(text), text
+
+def test_head_slice_falls_back_to_full_text():
+    filler = ("line item widget 3 x 4.00\n" * 400)
+    assert len(filler) > parser.HEAD_CHARS
+    # Fields past the head are still found by the full-text fallback
+    data = parser.parse_invoice_data(filler + "Invoice No: LATE-7\nDate: 2/3/2024\n")
+    assert (data['invoice_number'], data['date']) == ('LATE-7', '2-3-2024')
+    # A label split around the cut isn't truncated to what the head holds
+    pad = "x" * (parser.HEAD_CHARS - 20) + "\n"
+    data = parser.parse_invoice_data(pad + "Invoice Number:\n   ABCDEFGHIJ-123456\n" + filler)
+    assert data['invoice_number'] == 'ABCDEFGHIJ-123456'
+
+def test_no_digit_text_keeps_labelled_fields():
+    # Date, total and '#1234' numbers need digits and are skipped; the rest still runs
+    data = parser.parse_invoice_data("Acme Widgets Inc\nInvoice No: ABC-X\nTotal due: none\n")
+    assert data['invoice_number'] == 'ABC-X'
+    assert data['vendor'] == 'Acme Widgets Inc'
+    assert data['date'] is None and data['total_amount'] is None